@@ -1,85 +1,297 @@
+from functools import lru_cache
+from types import MappingProxyType
+import numpy as np
 import matplotlib.pyplot as plt
+
+try:
+  from numba import njit, prange
+  from numba.extending import register_jitable
+except ImportError:
+  def njit(*args, **kwargs):
+    """Fallback when numba is not installed: run the plain Python function."""
+    if args and callable(args[0]):
+      return args[0]
+    return lambda func: func
+  def register_jitable(func):
+    """Fallback when numba is not installed: the function only ever runs as plain Python."""
+    return func
+  prange = range
+
+# Pools with fewer shelters than this are calculated in plain Python: below it, loading (or, on a
+# cold cache, compiling) the parallel kernel costs more than it saves.
+JIT_MIN_SHELTERS = 50_000
+
+# The kWh formulas live only here. register_jitable functions run as plain Python when called from
+# Python and are compiled inline when called from the numba kernel.
+# Convert from W to kWh: multiply by hours in month (730 average) and divide by 1000.
+@register_jitable
+def _heating_kwh_per_degree(area, heat_loss_coef):
+  """Monthly heating energy (kWh) for each degree below the ideal temperature."""
+  return area * heat_loss_coef * 730 / 1000
+
+@register_jitable
+def _lighting_kwh(area, lighting_watts):
+  """Monthly lighting energy (kWh)."""
+  return area * lighting_watts * 730 / 1000
+
+@register_jitable
+def _compute_energy(temps, area, heat_loss_coef, lighting_watts, ideal_temperature):
+  """Monthly heating, lighting and total energy (kWh) plus the annual total for one shelter."""
+  # Lighting and the heating rate per degree don't depend on the month, so work them out once
+  lighting_energy = _lighting_kwh(area, lighting_watts)
+  heating_per_degree = _heating_kwh_per_degree(area, heat_loss_coef)
+  # Temperature difference (only for heating needs); whole-array ops keep the plain-Python path fast
+  heating = np.maximum(0.0, ideal_temperature - temps.astype(np.float64)) * heating_per_degree
+  monthly = heating + lighting_energy
+  # Monthly values are stored as float32, the annual total is accumulated in float64
+  total = monthly.sum()
+  lighting = np.full(temps.size, lighting_energy, dtype=np.float32)
+  return heating.astype(np.float32), lighting, monthly.astype(np.float32), total
+
+def _compute_energy_batch(temps, areas, heat_loss_coefs, lighting_watts, ideal_temperature):
+  """Run _compute_energy for every shelter (one row of temps each); in parallel across shelters when compiled."""
+  n_shelters, n_months = temps.shape
+  heating = np.empty((n_shelters, n_months), dtype=np.float32)
+  lighting = np.empty((n_shelters, n_months), dtype=np.float32)
+  monthly = np.empty((n_shelters, n_months), dtype=np.float32)
+  totals = np.empty(n_shelters)
+  for i in prange(n_shelters):
+    h, l, m, t = _compute_energy(temps[i], areas[i], heat_loss_coefs[i], lighting_watts[i], ideal_temperature)
+    heating[i] = h
+    lighting[i] = l
+    monthly[i] = m
+    totals[i] = t
+  return heating, lighting, monthly, totals
+
+_compute_energy_batch_jit = njit(parallel=True, cache=True)(_compute_energy_batch)
+
+def _climate_temps(climate):
+  """Monthly temperatures from a climate mapping, as the float32 array the kernels use."""
+  return np.fromiter(climate.values(), dtype=np.float32, count=len(climate))
+
+@lru_cache(maxsize=None)
+def _x_positions(n_months):
+  """Bar positions for n_months, shared by every shelter with that many months."""
+  x_pos = np.arange(n_months)
+  x_pos.flags.writeable = False
+  return x_pos
+
+class ShelterPool:
+  """Shelters stored column-wise (one array per field) so they can all be calculated in one pass.
+
+  Per-month arrays are float32: the inputs only have 2-3 significant figures, and it halves memory traffic.
+  """
+  _COLUMNS = ('areas', 'heat_loss_coefs', 'lighting_watts', 'temps',
+              'monthly_heating', 'monthly_lighting', 'monthly_energy', 'energy_consumption')
+
+  def __init__(self, n_months=12, capacity=8):
+    self.n_months = n_months
+    self.size = 0
+    self.names = []
+    self.climates = []
+    self.areas = np.full(capacity, np.nan)
+    self.heat_loss_coefs = np.full(capacity, np.nan)  # Unit: W/(m²·K)
+    self.lighting_watts = np.full(capacity, np.nan)
+    self.temps = np.full((capacity, n_months), np.nan, dtype=np.float32)
+    self.monthly_heating = np.full((capacity, n_months), np.nan, dtype=np.float32)
+    self.monthly_lighting = np.full((capacity, n_months), np.nan, dtype=np.float32)
+    self.monthly_energy = np.full((capacity, n_months), np.nan, dtype=np.float32)
+    self.energy_consumption = np.full(capacity, np.nan)
+
+  def add(self, name, area, heat_loss_coef, climate):
+    """Add a shelter to the pool and return a DogShelter view of it (not yet calculated)."""
+    return DogShelter(name, area, heat_loss_coef, climate, compute=False, pool=self)
+
+  def compute_all(self, ideal_temperature=20):
+    """Calculate energy for every shelter in the pool in one pass (compiled and parallel for large pools)."""
+    n = self.size
+    kernel = _compute_energy_batch_jit if n >= JIT_MIN_SHELTERS else _compute_energy_batch
+    heating, lighting, monthly, totals = kernel(
+      self.temps[:n], self.areas[:n], self.heat_loss_coefs[:n], self.lighting_watts[:n], float(ideal_temperature))
+    self.monthly_heating[:n] = heating
+    self.monthly_lighting[:n] = lighting
+    self.monthly_energy[:n] = monthly
+    self.energy_consumption[:n] = totals
+
+  def _append(self, name, area, heat_loss_coef, climate, lighting_watts):
+    """Store a shelter's inputs in the next free row and return its index."""
+    if len(climate) != self.n_months:
+      raise ValueError(f"Climate for '{name}' has {len(climate)} months, pool expects {self.n_months}")
+    if self.size == len(self.areas):
+      self._grow()
+    i = self.size
+    self.names.append(name)
+    self.climates.append(dict(climate))  # own copy: temps below must stay in step with it
+    self.areas[i] = area
+    self.heat_loss_coefs[i] = heat_loss_coef
+    self.lighting_watts[i] = lighting_watts
+    self.temps[i] = _climate_temps(climate)
+    self.size += 1
+    return i
+
+  def _set_climate(self, i, climate):
+    """Replace row i's climate, keeping the temps row used by the kernels in step."""
+    if len(climate) != self.n_months:
+      raise ValueError(f"Climate for '{self.names[i]}' has {len(climate)} months, pool expects {self.n_months}")
+    self.climates[i] = dict(climate)
+    self.temps[i] = _climate_temps(climate)
+
+  def _grow(self):
+    """Double the capacity of every column array."""
+    for column in self._COLUMNS:
+      old = getattr(self, column)
+      new = np.full((max(1, 2 * old.shape[0]),) + old.shape[1:], np.nan, dtype=old.dtype)
+      new[:self.size] = old[:self.size]
+      setattr(self, column, new)
+
+def _as_entered(value):
+  """Show a value read back from a pool's float64 column losslessly: whole numbers as ints, others in full."""
+  if isinstance(value, np.floating):
+    value = float(value)
+    return int(value) if value.is_integer() else value
+  return value
+
+def _pool_field(column, attr, doc):
+  """Property for a shelter field: this shelter's row of a ShelterPool column, or its own slot if unpooled."""
+  def fget(self):
+    if self._pool is None:
+      return getattr(self, attr)
+    return getattr(self._pool, column)[self._index]
+  def fset(self, value):
+    if self._pool is None:
+      setattr(self, attr, value)
+    else:
+      getattr(self._pool, column)[self._index] = value
+  return property(fget, fset, doc=doc)
+
 class DogShelter:
-  def __init__(self, name, area, heat_loss_coef, climate):
-    self.name = name
-    self.area = area
-    self.heat_loss_ceof = heat_loss_coef  # Unit: W/(m²·K)
-    self.climate = climate
-    self.lighting_energy_per_area_watts = 2  # Placeholder value for lighting energy per m² in watts
-    self.monthly_heating = []
-    self.monthly_lighting = []
-    self.monthly_energy = []
-    self.energy_consumption = self.calculate_total_energy()
+  """A single shelter: a view onto one row of a ShelterPool, or a standalone object holding its own fields."""
+  __slots__ = ('_pool', '_index', '_months', '_x_pos',
+               # Only used by shelters created without a pool
+               '_name', '_climate', '_area', '_heat_loss_coef', '_lighting_watts',
+               '_monthly_heating', '_monthly_lighting', '_monthly_energy', '_energy_consumption')
+
+  name = _pool_field('names', '_name', "Shelter name")
+  area = _pool_field('areas', '_area', "Floor area (m²)")
+  heat_loss_coef = _pool_field('heat_loss_coefs', '_heat_loss_coef', "Heat loss coefficient, W/(m²·K)")
+  lighting_energy_per_area_watts = _pool_field('lighting_watts', '_lighting_watts', "Lighting power per m² (W)")
+  monthly_heating = _pool_field('monthly_heating', '_monthly_heating', "Heating energy per month (kWh)")
+  monthly_lighting = _pool_field('monthly_lighting', '_monthly_lighting', "Lighting energy per month (kWh)")
+  monthly_energy = _pool_field('monthly_energy', '_monthly_energy', "Total energy per month (kWh)")
+
+  def __init__(self, name, area, heat_loss_coef, climate, compute=True, pool=None):
+    self._pool = pool
+    # Lighting is a placeholder value of 2 W per m²
+    if pool is not None:
+      self._index = pool._append(name, area, heat_loss_coef, climate, lighting_watts=2)
+    else:
+      # A shelter created on its own keeps its fields in slots rather than allocating a pool
+      self._index = None
+      self._name = name
+      self._area = area
+      self._heat_loss_coef = heat_loss_coef
+      self._lighting_watts = 2
+      self._climate = dict(climate)
+      self._monthly_heating = self._monthly_lighting = self._monthly_energy = None
+      self._energy_consumption = None
+    self._set_plot_labels(climate)
+    # Pass compute=False to defer the calculation to ShelterPool.compute_all
+    if compute:
+      self.energy_consumption = self.calculate_total_energy()
+
+  @property
+  def climate(self):
+    """Read-only mapping of month name to average temperature (°C); assign a new mapping to change it."""
+    if self._pool is None:
+      return MappingProxyType(self._climate)
+    return MappingProxyType(self._pool.climates[self._index])
+
+  @climate.setter
+  def climate(self, value):
+    if self._pool is None:
+      self._climate = dict(value)
+    else:
+      self._pool._set_climate(self._index, value)
+    self._set_plot_labels(value)
+
+  @property
+  def temps(self):
+    """Monthly temperatures as a float32 array (change them by assigning climate)."""
+    if self._pool is None:
+      # Built on demand so a standalone shelter doesn't hold a second copy of its climate
+      return _climate_temps(self._climate)
+    return self._pool.temps[self._index]
+
+  def _set_plot_labels(self, climate):
+    # Month labels and bar positions for plotting, worked out once per climate rather than on every plot
+    self._months = tuple(climate)
+    self._x_pos = _x_positions(len(self._months))
+
+  @property
+  def energy_consumption(self):
+    """Estimated annual total energy consumption (kWh), or None if not calculated yet."""
+    if self._pool is None:
+      return self._energy_consumption
+    total = self._pool.energy_consumption[self._index]
+    return None if np.isnan(total) else float(total)
+
+  @energy_consumption.setter
+  def energy_consumption(self, value):
+    if self._pool is None:
+      self._energy_consumption = None if value is None else float(value)
+    else:
+      self._pool.energy_consumption[self._index] = np.nan if value is None else value
     
+  def _check_calculated(self):
+    if self.energy_consumption is None:
+      raise ValueError(f"Energy for '{self.name}' not calculated yet; call calculate_total_energy or ShelterPool.compute_all")
+
   def print(self):
+    self._check_calculated()
     print(f"Shelter Name: {self.name}")
-    print(f"Area (m²): {self.area}")
-    print(f"Heat Loss Coefficient (W/(m²·K)): {self.heat_loss_ceof}")
-    print(f"Climate: {self.climate}")
+    print(f"Area (m²): {_as_entered(self.area)}")
+    print(f"Heat Loss Coefficient (W/(m²·K)): {_as_entered(self.heat_loss_coef)}")
+    print(f"Climate: {dict(self.climate)}")
     print(f"Estimated Annual Total Energy Consumption (kWh): {self.energy_consumption:.2f}")
 
   def calculate_heating(self, temp_diff):
-    """Calculate heating energy for a given temperature difference."""
-    # Convert from W to kWh: multiply by hours in month (730 average) and divide by 1000
-    heating_energy = temp_diff * self.area * self.heat_loss_ceof * 730 / 1000
-    return heating_energy
+    """Calculate heating energy for a given temperature difference (scalar or array)."""
+    return temp_diff * _heating_kwh_per_degree(self.area, self.heat_loss_coef)
   
   def calculate_lighting(self):
     """Calculate lighting energy for the shelter."""
     # Placeholder for lighting calculation
-    lighting_energy = self.area * self.lighting_energy_per_area_watts * 730 / 1000  # Convert to kWh
-    return lighting_energy
+    return _lighting_kwh(self.area, self.lighting_energy_per_area_watts)
   
   def calculate_total_energy(self, ideal_temperature=20):
-    """Calculate total energy consumption by iterating through months and calling helper functions."""
-    total_energy = 0
-    self.monthly_energy = []
-    self.monthly_heating = []
-    self.monthly_lighting = []
-    
-    for month, temp in self.climate.items():
-      # Calculate temperature difference (only for heating needs)
-      temp_diff = max(0, ideal_temperature - temp)
-      
-      # Call helper functions for each energy type
-      heating_energy = self.calculate_heating(temp_diff)
-      lighting_energy = self.calculate_lighting()
-      
-      # Store heating and lighting separately
-      self.monthly_heating.append(heating_energy)
-      self.monthly_lighting.append(lighting_energy)
-      
-      # Total energy for this month
-      monthly_total = heating_energy + lighting_energy
-      self.monthly_energy.append(monthly_total)
-      total_energy += monthly_total
-    
+    """Calculate total energy consumption for all months in a single pass."""
+    self.monthly_heating, self.monthly_lighting, self.monthly_energy, total_energy = _compute_energy(
+      self.temps, float(self.area), float(self.heat_loss_coef),
+      float(self.lighting_energy_per_area_watts), float(ideal_temperature))
     return total_energy
 
-  def plot_monthly_energy(self):
-    months = list(self.climate.keys())
-    
-    plt.figure(figsize=(12, 6))
-    x_pos = range(len(months))
+  def plot_monthly_energy(self, show=True):
+    self._check_calculated()
+    # Reuse one labelled figure across shelters instead of opening a new one each call
+    fig = plt.figure("Dog shelter monthly energy", figsize=(12, 6), clear=True)
     
     # Create stacked bar chart
-    bars1 = plt.bar(x_pos, self.monthly_heating, label='Heating', color='#FF6B6B')
-    bars2 = plt.bar(x_pos, self.monthly_lighting, bottom=self.monthly_heating, label='Lighting', color='#FFA500')
+    bars1 = plt.bar(self._x_pos, self.monthly_heating, label='Heating', color='#FF6B6B')
+    bars2 = plt.bar(self._x_pos, self.monthly_lighting, bottom=self.monthly_heating, label='Lighting', color='#FFA500')
     
-    # Add value labels on top of each bar
-    for i, month in enumerate(months):
-      total = self.monthly_heating[i] + self.monthly_lighting[i]
-      plt.text(i, total, f'{total:.1f}', ha='center', va='bottom', fontsize=9)
+    # Label the top of each stacked bar with the month's total
+    plt.bar_label(bars2, labels=[f'{total:.1f}' for total in self.monthly_energy], fontsize=9)
     
     plt.xlabel('Month')
     plt.ylabel('Energy Consumption (kWh)')
     plt.title(f'Monthly Energy Consumption Split for {self.name}')
-    plt.xticks(x_pos, months, rotation=45, ha='right')
+    plt.xticks(self._x_pos, self._months, rotation=45, ha='right')
     plt.legend()
     plt.grid(axis='y', alpha=0.3)
     plt.tight_layout()
-    plt.savefig(f"{self.name}_monthly_energy.png")
-    plt.show()
+    fig.savefig(f"{self.name}_monthly_energy.png")
+    if show:
+      plt.show()
     
   
   
@@ -116,8 +328,10 @@ if __name__ == "__main__":
     "December": 3
   }
 
-  ukshelter = DogShelter("Many Tears Rescue Wales", 150, standard_hl_coef, crosshands_monthly_temps)
-  italyshelter = DogShelter("APS", 300, standard_hl_coef, cornaredo_monthly_temps)
+  shelters = ShelterPool()
+  ukshelter = shelters.add("Many Tears Rescue Wales", 150, standard_hl_coef, crosshands_monthly_temps)
+  italyshelter = shelters.add("APS", 300, standard_hl_coef, cornaredo_monthly_temps)
+  shelters.compute_all()
   ukshelter.print()
   italyshelter.print()
   ukshelter.plot_monthly_energy()
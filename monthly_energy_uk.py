@@ -1,32 +1,175 @@
-import pandas as pd
+import csv
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+import numpy as np
 import matplotlib.pyplot as plt
-from typing import Dict
+from typing import Dict, Tuple, Union
 
-def calculate_monthly_usage(postcode: str, actual_households: int, monthly_relative_usage: Dict[str, float], domestic_percentage: float = 0.406) -> Dict[str, float]:
+try:
+  import pandas as pd
+except ImportError:
+  pd = None  # fall back to the csv module for loading
+
+try:
+  from numba import njit
+except ImportError:
+  def njit(*args, **kwargs):
+    """Fallback when numba is not installed: run the plain Python function."""
+    if args and callable(args[0]):
+      return args[0]
+    return lambda func: func
+
+try:
+  import pyarrow  # noqa: F401
+  CSV_ENGINE = 'pyarrow'  # multithreaded Arrow CSV parser
+except ImportError:
+  CSV_ENGINE = 'c'
+
+POSTCODE_CSV = "Postcode_level_all_meters_electricity_2024.csv"
+# Only these columns are used; reading just them (with fixed dtypes) cuts parse time and memory
+POSTCODE_COLUMNS = {'Postcode': 'string', 'Total_cons_kwh': 'float64', 'Num_meters': 'int32'}
+
+class PostcodeIndex:
+  """Postcode columns as NumPy arrays sorted by postcode, so a prefix lookup is a binary search instead of a full scan."""
+  def __init__(self, postcodes: np.ndarray, consumption: np.ndarray, meters: np.ndarray):
+    order = np.argsort(postcodes, kind='stable')
+    self.postcodes = postcodes[order]
+    self.consumption = consumption[order]
+    self.meters = meters[order]
+    self._outcode_rows = self._build_outcode_table()
+
+  def rows(self, prefix: str) -> slice:
+    """Return the slice of rows whose postcode starts with prefix (O(1) for an outcode, O(log N) otherwise)."""
+    outcode_rows = self._outcode_rows.get(prefix)
+    if outcode_rows is not None:
+      return outcode_rows
+    return self._search(prefix)
+
+  def _build_outcode_table(self) -> Dict[str, slice]:
+    """Map every outcode (the part of a postcode before the space) to the rows starting with it."""
+    table = {}
+    width = self.postcodes.dtype.itemsize // np.dtype('U1').itemsize
+    i = 0
+    while i < len(self.postcodes):
+      outcode = str(self.postcodes[i]).partition(' ')[0]
+      table[outcode] = self._search(outcode)
+      # Jump to the next outcode: '!' sorts straight after the space that ends this one
+      if len(outcode) < width:
+        i = int(np.searchsorted(self.postcodes, outcode + '!', side='left'))
+      else:
+        i = int(np.searchsorted(self.postcodes, outcode, side='right'))
+    return table
+
+  def _search(self, prefix: str) -> slice:
+    """Binary-search the sorted postcodes for the rows starting with prefix."""
+    if not prefix:
+      return slice(0, len(self.postcodes))
+    # A key longer than the array's item size would make NumPy cast the whole array, and can't match anyway
+    if len(prefix) > self.postcodes.dtype.itemsize // np.dtype('U1').itemsize:
+      return slice(0, 0)
+    lo = np.searchsorted(self.postcodes, prefix, side='left')
+    # Smallest string greater than every string starting with prefix, and never longer than prefix
+    hi = np.searchsorted(self.postcodes, prefix[:-1] + chr(ord(prefix[-1]) + 1), side='left')
+    return slice(int(lo), int(hi))
+
+def _read_postcode_columns(path: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+  """Read the Postcode, Total_cons_kwh and Num_meters columns, skipping rows without a postcode."""
+  if pd is not None:
+    df = pd.read_csv(path, usecols=list(POSTCODE_COLUMNS), dtype=POSTCODE_COLUMNS, engine=CSV_ENGINE)
+    df = df.dropna(subset=['Postcode'])
+    return (df['Postcode'].to_numpy(dtype=str),
+            df['Total_cons_kwh'].to_numpy(dtype=np.float64),
+            df['Num_meters'].to_numpy(dtype=np.int64))
+  
+  postcodes, consumption, meters = [], [], []
+  with open(path, newline='') as f:
+    reader = csv.reader(f)
+    header = next(reader)
+    ip, ic, im = header.index('Postcode'), header.index('Total_cons_kwh'), header.index('Num_meters')
+    for row in reader:
+      if row[ip]:
+        postcodes.append(row[ip])
+        consumption.append(float(row[ic]))
+        meters.append(int(row[im]))
+  return np.array(postcodes, dtype=str), np.array(consumption, dtype=np.float64), np.array(meters, dtype=np.int64)
+
+@lru_cache(maxsize=4)
+def _read_postcode_csv(path: str, mtime: float) -> PostcodeIndex:
+  """Parse and index the postcode CSV. Cached on (path, mtime) so edits to the file are picked up."""
+  return PostcodeIndex(*_read_postcode_columns(path))
+
+@dataclass(frozen=True, eq=False)
+class MonthlySeries:
+  """Month names with their values as one array, so a series can be passed along without rebuilding dicts."""
+  keys: Tuple[str, ...]
+  values: np.ndarray
+
+  @classmethod
+  def from_dict(cls, monthly: Dict[str, float]) -> 'MonthlySeries':
+    return cls(tuple(monthly), np.fromiter(monthly.values(), dtype=np.float64, count=len(monthly)))
+
+  def to_dict(self) -> Dict[str, float]:
+    return dict(zip(self.keys, self.values.tolist()))
+
+MonthlyValues = Union[Dict[str, float], MonthlySeries]
+
+def _as_series(monthly: MonthlyValues) -> MonthlySeries:
+  """Return monthly as a MonthlySeries, converting from a dict only if needed."""
+  return monthly if isinstance(monthly, MonthlySeries) else MonthlySeries.from_dict(monthly)
+
+@njit(cache=True)
+def _monthly_consumption(factors, consumption_per_household, households, domestic_percentage):
+  """Share the scaled-up annual consumption across months in proportion to factors, in MWh."""
+  # The per-household figure is domestic_percentage of the total, so scale up by 1/domestic_percentage
+  total = consumption_per_household * households / domestic_percentage
+  sum_factors = 0.0
+  for i in range(factors.size):
+    sum_factors += factors[i]
+  # Normalising to 12 and then taking total / 12 per month cancels, so it is folded into one scale
+  scale = total / sum_factors / 1000
+  out = np.empty_like(factors)
+  for i in range(factors.size):
+    out[i] = factors[i] * scale
+  return out
+
+def calculate_monthly_usage(postcode: str, actual_households: int, monthly_relative_usage: MonthlyValues, domestic_percentage: float = 0.406) -> Dict[str, float]:
   """
   Calculate monthly energy usage for a postcode based on actual households and monthly trends.
   
   Args:
     postcode: Postcode area to lookup (e.g., 'IV47', 'EH1')
     actual_households: Number of households to scale to
-    monthly_relative_usage: Dictionary mapping month names to relative usage factors
+    monthly_relative_usage: Dictionary (or MonthlySeries) mapping month names to relative usage factors
                            (e.g., {'January': 1.2, 'February': 1.15, ...})
     domestic_percentage: Fraction of total energy consumption that is domestic (default: 0.406 for 40.6%)
   
   Returns:
     Dictionary with monthly consumption values in MWh
   """
-  df = pd.read_csv("Postcode_level_all_meters_electricity_2024.csv")
+  factors = _as_series(monthly_relative_usage)
+  # The result is a pure function of the arguments and the loaded data, so it is memoised
+  path = POSTCODE_CSV
+  monthly_consumption = _calculate_monthly_usage_cached(
+    path, os.path.getmtime(path), postcode, actual_households, factors.keys, tuple(factors.values.tolist()), domestic_percentage)
   
+  # Build a fresh dict each call so callers can't mutate the cached result
+  return dict(monthly_consumption)
+
+@lru_cache(maxsize=128)
+def _calculate_monthly_usage_cached(path: str, mtime: float, postcode: str, actual_households: int, months: Tuple[str, ...],
+                                    relative_factors: Tuple[float, ...], domestic_percentage: float) -> Tuple[Tuple[str, float], ...]:
+  """Cached body of calculate_monthly_usage; (path, mtime) is part of the key so a changed CSV isn't served stale results."""
   # Filter data for the postcode
-  postcode_data = df[df['Postcode'].str.startswith(postcode, na=False)]
+  index = _read_postcode_csv(path, mtime)
+  rows = index.rows(postcode)
   
-  if postcode_data.empty:
+  if rows.start == rows.stop:
     raise ValueError(f"Postcode '{postcode}' not found in dataset")
   
   # Get total annual consumption from data
-  total_consumption_data = postcode_data['Total_cons_kwh'].sum()
-  total_households_data = postcode_data['Num_meters'].sum()
+  total_consumption_data = index.consumption[rows].sum()
+  total_households_data = index.meters[rows].sum()
   
   if total_households_data == 0:
     raise ValueError(f"No household data found for postcode '{postcode}'")
@@ -34,39 +177,34 @@ def calculate_monthly_usage(postcode: str, actual_households: int, monthly_relat
   # Calculate consumption per household
   consumption_per_household = total_consumption_data / total_households_data
   
-  # Calculate total usage for actual number of households
-  total_annual_consumption = consumption_per_household * actual_households
-  
-  # The calculated result is domestic_percentage of total energy consumption
-  # Scale up to get the full total (e.g., if domestic is 40.6%, scale up by 1/0.406)
-  total_annual_consumption = total_annual_consumption / domestic_percentage
-  
-  # Normalize monthly relative usage so that it sums to 12 (average of 1.0 per month)
-  sum_relative = sum(monthly_relative_usage.values())
-  normalized_monthly = {month: factor / sum_relative * 12 for month, factor in monthly_relative_usage.items()}
+  # No months to share the total across (the kernel would divide by a zero sum)
+  if not relative_factors:
+    return ()
   
-  # Calculate monthly consumption in MWh (divide by 1000)
-  monthly_consumption = {}
-  for month, relative_factor in normalized_monthly.items():
-    monthly_consumption[month] = (total_annual_consumption / 12) * relative_factor / 1000
+  # Scale to the actual number of households and the full (not just domestic) total, split by month
+  monthly_consumption = _monthly_consumption(
+    np.array(relative_factors, dtype=np.float64), float(consumption_per_household),
+    float(actual_households), float(domestic_percentage))
   
-  return monthly_consumption
+  return tuple(zip(months, monthly_consumption.tolist()))
 
-def make_relative(monthly_consumption: Dict[str, float]) -> Dict[str, float]:
+def make_relative(monthly_consumption: MonthlyValues) -> MonthlyValues:
   """
   Convert monthly consumption values to relative proportions.
   
   Args:
-    monthly_consumption: Dictionary mapping months to consumption values
+    monthly_consumption: Dictionary (or MonthlySeries) mapping months to consumption values
   
   Returns:
-    Dictionary with each month's proportion of total annual consumption (sums to 1.0)
+    Each month's proportion of total annual consumption (sums to 1.0), as the same type as the input
   """
-  total = sum(monthly_consumption.values())
+  series = _as_series(monthly_consumption)
+  total = series.values.sum()
   if total == 0:
     return monthly_consumption
   
-  return {month: consumption / total for month, consumption in monthly_consumption.items()}
+  relative = MonthlySeries(series.keys, series.values / total)
+  return relative if isinstance(monthly_consumption, MonthlySeries) else relative.to_dict()
 
 def plot_monthly_usage(monthly_consumption: Dict[str, float], title: str = "Monthly Energy Usage"):
   """
@@ -79,15 +217,12 @@ def plot_monthly_usage(monthly_consumption: Dict[str, float], title: str = "Mont
   months = list(monthly_consumption.keys())
   consumption = list(monthly_consumption.values())
   
-  plt.figure(figsize=(12, 6))
+  # Reuse one labelled figure across calls instead of opening a new one each time
+  plt.figure("Monthly energy usage", figsize=(12, 6), clear=True)
   bars = plt.bar(months, consumption, color='steelblue')
   
   # Add value labels on top of each bar
-  for bar in bars:
-    height = bar.get_height()
-    plt.text(bar.get_x() + bar.get_width()/2., height,
-            f'{height:.1f}',
-            ha='center', va='bottom', fontsize=9)
+  plt.bar_label(bars, fmt='%.1f', fontsize=9)
   
   plt.xlabel('Month')
   plt.ylabel('Energy Consumption (MWh)')
@@ -118,8 +253,8 @@ if __name__ == "__main__":
     'November': 1.8,
     'December': 1.85
   }
-  national_monthly_relative_usage = make_relative(national_monthly_usage)
-  print(national_monthly_relative_usage)
+  national_monthly_relative_usage = make_relative(MonthlySeries.from_dict(national_monthly_usage))
+  print(national_monthly_relative_usage.to_dict())
   
   # Calculate monthly usage
   monthly_usage = calculate_monthly_usage(postcode, actual_households, national_monthly_relative_usage)